@@ -20,6 +20,9 @@ class GPT5Generator:
         # OpenAI クライアントを初期化（GPT-5対応）
         self.client = openai.OpenAI(api_key=self.api_key)
 
+        # 直近のAPI呼び出しのトークン使用量（実行履歴レジャー用）
+        self.last_usage: Optional[Dict] = None
+
     def generate_content(self, recording_data: Dict, meeting_topic: str = '') -> Optional[Dict]:
         """
         録画データからGPT-5を使用してコンテンツを生成
@@ -57,6 +60,14 @@ class GPT5Generator:
                 reasoning_effort="standard"  # 高品質な推論
             )
 
+            usage = getattr(response, 'usage', None)
+            if usage:
+                self.last_usage = {
+                    "prompt_tokens": usage.prompt_tokens,
+                    "completion_tokens": usage.completion_tokens,
+                    "total_tokens": usage.total_tokens,
+                }
+
             content = response.choices[0].message.content.strip()
 
             # レスポンスをパース
@@ -6,105 +6,138 @@ Zoomの録画完了後、GPT-5でタイトル生成、Discordに投稿
 
 import os
 import sys
+import queue
+import atexit
 import logging
+import logging.handlers
 from datetime import datetime
 from pathlib import Path
 
-# ログ設定
+# ログ設定（ファイルI/OはQueueListenerのスレッドで行い、処理をブロックしない）
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_dir / f"zoom_discord_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+file_handler = logging.FileHandler(log_dir / f"zoom_discord_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+stream_handler = logging.StreamHandler(sys.stdout)
+for handler in (file_handler, stream_handler):
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
 )
+# QueueHandler側では整形せず、リスナーのハンドラーでのみフォーマットする
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+log_listener.start()
+atexit.register(log_listener.stop)  # 終了時にキューに残ったログを書き出す
 
 logger = logging.getLogger(__name__)
 
 from zoom_handler import ZoomHandler
 from gpt5_generator import GPT5Generator
 from discord_poster import DiscordPoster
+from run_ledger import RunLedger, RunRecorder
 
 
 def main():
     """メイン処理"""
+    # 実行履歴レジャー（1実行につき1レコード）
+    recorder = RunRecorder(RunLedger(), os.getenv('MEETING_UUID', ''))
+
     try:
         logger.info("🚀 Zoom to Discord 自動投稿プロセスを開始します")
+        logger.info(f"🆔 実行ID: {recorder.record['run_id']}")
 
-        # 環境変数の取得
-        meeting_uuid = os.getenv('MEETING_UUID')
-        meeting_topic = os.getenv('MEETING_TOPIC', '')
+        with recorder.stage("setup"):
+            # 環境変数の取得
+            meeting_uuid = os.getenv('MEETING_UUID')
+            meeting_topic = os.getenv('MEETING_TOPIC', '')
 
-        if not meeting_uuid:
-            logger.error("❌ MEETING_UUID環境変数が設定されていません")
-            sys.exit(1)
+            if not meeting_uuid:
+                logger.error("❌ MEETING_UUID環境変数が設定されていません")
+                sys.exit(1)
 
-        logger.info(f"📋 処理対象ミーティング: {meeting_uuid}")
-        if meeting_topic:
-            logger.info(f"📝 ミーティングトピック: {meeting_topic}")
+            logger.info(f"📋 処理対象ミーティング: {meeting_uuid}")
+            if meeting_topic:
+                logger.info(f"📝 ミーティングトピック: {meeting_topic}")
 
         # 1. Zoom録画情報を取得
-        logger.info("📹 Zoom録画情報を取得中...")
-        zoom_handler = ZoomHandler()
-        recording_data = zoom_handler.get_recording_info(meeting_uuid)
+        with recorder.stage("zoom"):
+            logger.info("📹 Zoom録画情報を取得中...")
+            zoom_handler = ZoomHandler()
+            recording_data = zoom_handler.get_recording_info(meeting_uuid)
 
-        if not recording_data:
-            logger.error("❌ 録画情報の取得に失敗しました")
-            sys.exit(1)
+            if not recording_data:
+                logger.error("❌ 録画情報の取得に失敗しました")
+                sys.exit(1)
 
-        logger.info(f"✅ 録画情報取得成功: {recording_data.get('topic', 'N/A')}")
+            logger.info(f"✅ 録画情報取得成功: {recording_data.get('topic', 'N/A')}")
 
         # 1.5. 録画時間チェック（設定された最小時間以上の場合のみ処理を継続）
-        duration_minutes = recording_data.get('duration', 0)
-        min_duration_threshold = int(os.getenv('MIN_RECORDING_DURATION', '30'))  # 最小録画時間（分）
+        with recorder.stage("filter"):
+            duration_minutes = recording_data.get('duration', 0)
+            min_duration_threshold = int(os.getenv('MIN_RECORDING_DURATION', '30'))  # 最小録画時間（分）
 
-        logger.info(f"📊 録画時間: {duration_minutes}分")
+            logger.info(f"📊 録画時間: {duration_minutes}分")
 
-        if duration_minutes < min_duration_threshold:
-            logger.info(f"⏳ 録画時間が{min_duration_threshold}分未満のため、処理をスキップします")
-            logger.info(f"   現在の録画時間: {duration_minutes}分 < 閾値: {min_duration_threshold}分")
-            logger.info("✨ 処理を正常終了します（投稿なし）")
-            return
+            if duration_minutes < min_duration_threshold:
+                logger.info(f"⏳ 録画時間が{min_duration_threshold}分未満のため、処理をスキップします")
+                logger.info(f"   現在の録画時間: {duration_minutes}分 < 閾値: {min_duration_threshold}分")
+                logger.info("✨ 処理を正常終了します（投稿なし）")
+                recorder.skip()
+                return
 
-        logger.info(f"✅ 録画時間が{min_duration_threshold}分以上のため、処理を継続します")
+            logger.info(f"✅ 録画時間が{min_duration_threshold}分以上のため、処理を継続します")
 
         # 2. GPT-5でタイトルと説明を生成
-        logger.info("🤖 GPT-5でコンテンツ生成中...")
-        gpt5_generator = GPT5Generator()
-        generated_content = gpt5_generator.generate_content(recording_data, meeting_topic)
+        with recorder.stage("generate"):
+            logger.info("🤖 GPT-5でコンテンツ生成中...")
+            gpt5_generator = GPT5Generator()
+            try:
+                generated_content = gpt5_generator.generate_content(recording_data, meeting_topic)
+            finally:
+                recorder.set_tokens(gpt5_generator.last_usage)
 
-        if not generated_content:
-            logger.error("❌ GPT-5によるコンテンツ生成に失敗しました")
-            sys.exit(1)
+            if not generated_content:
+                logger.error("❌ GPT-5によるコンテンツ生成に失敗しました")
+                sys.exit(1)
 
-        logger.info(f"✅ コンテンツ生成成功: {generated_content['title']}")
+            logger.info(f"✅ コンテンツ生成成功: {generated_content['title']}")
 
         # 3. Discordに投稿
-        logger.info("📤 Discordに投稿中...")
-        discord_poster = DiscordPoster()
-        success = discord_poster.post_to_forum(
-            title=generated_content['title'],
-            description=generated_content['description'],
-            zoom_url=recording_data.get('share_url', ''),
-            thumbnail_url=None,
-            tags=generated_content.get('tags', [])
-        )
-
-        if success:
-            logger.info("🎉 Discord投稿完了！")
-        else:
-            logger.error("❌ Discord投稿に失敗しました")
-            sys.exit(1)
+        with recorder.stage("discord"):
+            logger.info("📤 Discordに投稿中...")
+            discord_poster = DiscordPoster()
+            success = discord_poster.post_to_forum(
+                title=generated_content['title'],
+                description=generated_content['description'],
+                zoom_url=recording_data.get('share_url', ''),
+                thumbnail_url=None,
+                tags=generated_content.get('tags', [])
+            )
+
+            if success:
+                logger.info("🎉 Discord投稿完了！")
+            else:
+                logger.error("❌ Discord投稿に失敗しました")
+                sys.exit(1)
 
         logger.info("✨ 全ての処理が正常に完了しました")
 
     except Exception as e:
+        recorder.fail()
         logger.error(f"💥 予期しないエラーが発生しました: {str(e)}", exc_info=True)
         sys.exit(1)
 
+    finally:
+        try:
+            record = recorder.finish()
+            logger.info(f"📒 実行履歴を記録しました: {record['outcome']} ({record['duration_ms']}ms)")
+        except OSError as e:
+            logger.warning(f"⚠️ 実行履歴の記録に失敗しました: {str(e)}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+実行履歴レジャー
+1回の実行につき1行のJSONLレコードを追記し、履歴を集計するCLIを提供
+
+使用例:
+    python scripts/run_ledger.py slowest --last 20
+    python scripts/run_ledger.py failures --last 50
+    python scripts/run_ledger.py recent --last 10
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_LEDGER_PATH = Path("logs") / "run_ledger.jsonl"
+DEFAULT_MAX_BYTES = 1024 * 1024  # 1MB
+DEFAULT_BACKUP_COUNT = 5
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    """整数の環境変数を取得（未設定・不正値の場合はデフォルト値）"""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"{name}の値が不正です（{value!r}）。デフォルト値 {default} を使用します")
+        return default
+
+
+class RunLedger:
+    """JSONL形式の実行履歴（サイズ超過時にローテーション）"""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        backup_count: Optional[int] = None
+    ):
+        self.path = Path(path or os.getenv('RUN_LEDGER_PATH', DEFAULT_LEDGER_PATH))
+        self.max_bytes = max_bytes if max_bytes is not None else _env_int(
+            'RUN_LEDGER_MAX_BYTES', DEFAULT_MAX_BYTES
+        )
+        self.backup_count = backup_count if backup_count is not None else _env_int(
+            'RUN_LEDGER_BACKUP_COUNT', DEFAULT_BACKUP_COUNT
+        )
+
+    def append(self, record: Dict) -> None:
+        """レコードを1行追記"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+        self._rotate_if_needed(len(line.encode('utf-8')))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        """追記でmax_bytesを超える場合、ファイルを .1, .2 ... にずらす"""
+        if self.max_bytes <= 0 or not self.path.exists():
+            return
+        if self.path.stat().st_size + incoming <= self.max_bytes:
+            return
+
+        if self.backup_count <= 0:
+            self.path.unlink()
+            return
+
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self._backup_path(i)
+            if src.exists():
+                src.replace(self._backup_path(i + 1))
+        self.path.replace(self._backup_path(1))
+
+    def _backup_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+    def read(self, last: Optional[int] = None) -> List[Dict]:
+        """レコードを古い順に読み込み（lastを指定すると直近N件のみ）"""
+        files = [self._backup_path(i) for i in range(self.backup_count, 0, -1)]
+        files.append(self.path)
+
+        records = []
+        for file in files:
+            if not file.exists():
+                continue
+            with open(file, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # 書き込み途中の行などは無視
+
+        if last is not None:
+            records = records[-last:] if last > 0 else []
+        return records
+
+
+class RunRecorder:
+    """1回の実行の計測値を収集し、終了時にレジャーへ書き込む"""
+
+    def __init__(self, ledger: RunLedger, meeting_uuid: str = ''):
+        self.ledger = ledger
+        self.record = {
+            "run_id": str(uuid.uuid4()),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "meeting_uuid": meeting_uuid,
+            "outcome": None,
+            "failed_stage": None,
+            "duration_ms": None,
+            "stages": {},
+            "tokens": {},
+        }
+        self._started = time.perf_counter()
+        self._current_stage: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """ステージの所要時間を計測（例外時は失敗ステージとして記録）"""
+        self._current_stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record["failed_stage"] = name
+            raise
+        finally:
+            self.record["stages"][name] = round((time.perf_counter() - start) * 1000, 1)
+            self._current_stage = None
+
+    def fail(self) -> None:
+        """失敗として記録（失敗ステージは実行中または例外の発生したステージ）"""
+        self.record["outcome"] = "failure"
+        self.record["failed_stage"] = self.record["failed_stage"] or self._current_stage
+
+    def skip(self) -> None:
+        """処理対象外（投稿なし）として記録"""
+        self.record["outcome"] = "skipped"
+
+    def set_tokens(self, usage: Optional[Dict]) -> None:
+        """トークン使用量を記録"""
+        if usage:
+            self.record["tokens"] = usage
+
+    def finish(self) -> Dict:
+        """実行を終了してレジャーに追記（fail/skip未呼び出しなら例外の有無から結果を判定）"""
+        if not self.record["outcome"]:
+            self.record["outcome"] = "failure" if self.record["failed_stage"] else "success"
+        self.record["duration_ms"] = round((time.perf_counter() - self._started) * 1000, 1)
+        self.ledger.append(self.record)
+        return self.record
+
+
+def slowest_stages(records: List[Dict]) -> List[Dict]:
+    """ステージ別の所要時間（平均・最大）を遅い順に集計"""
+    timings: Dict[str, List[float]] = {}
+    for record in records:
+        for name, ms in (record.get("stages") or {}).items():
+            timings.setdefault(name, []).append(ms)
+
+    rows = [
+        {
+            "stage": name,
+            "runs": len(values),
+            "avg_ms": round(sum(values) / len(values), 1),
+            "max_ms": max(values),
+        }
+        for name, values in timings.items()
+    ]
+    return sorted(rows, key=lambda row: row["avg_ms"], reverse=True)
+
+
+def failure_rates(records: List[Dict]) -> List[Dict]:
+    """ステージ別の失敗率を集計（そのステージに到達した実行数が分母）"""
+    reached: Dict[str, int] = {}
+    failed: Dict[str, int] = {}
+    for record in records:
+        stages = record.get("stages") or {}
+        for name in stages:
+            reached[name] = reached.get(name, 0) + 1
+        if record.get("outcome") == "failure":
+            name = record.get("failed_stage") or "unknown"
+            failed[name] = failed.get(name, 0) + 1
+            if name not in stages:
+                # ステージ外の失敗も分母に数える（失敗率が100%を超えないように）
+                reached[name] = reached.get(name, 0) + 1
+
+    rows = [
+        {
+            "stage": name,
+            "runs": reached[name],
+            "failures": failed.get(name, 0),
+            "failure_rate": round(failed.get(name, 0) / reached[name], 3),
+        }
+        for name in reached
+    ]
+    return sorted(rows, key=lambda row: row["failure_rate"], reverse=True)
+
+
+def _print_table(rows: List[Dict]) -> None:
+    if not rows:
+        print("(レコードなし)")
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(row.get(c, ''))) for row in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, '')).ljust(widths[c]) for c in columns))
+
+
+def _positive_int(value: str) -> int:
+    """--last 用の引数型（1以上の整数のみ許可）"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"整数を指定してください: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+    return number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """レジャー集計CLI"""
+    parser = argparse.ArgumentParser(description="Zoom to Discord 実行履歴の集計")
+    parser.add_argument('command', choices=['slowest', 'failures', 'recent'],
+                        help="slowest: ステージ別所要時間 / failures: ステージ別失敗率 / recent: 直近の実行")
+    parser.add_argument('--last', type=_positive_int, default=50, help="対象とする直近の実行数（デフォルト: 50）")
+    parser.add_argument('--path', type=Path, default=None, help="レジャーファイルのパス")
+    parser.add_argument('--json', action='store_true', help="JSONで出力")
+    args = parser.parse_args(argv)
+
+    records = RunLedger(args.path).read(last=args.last)
+
+    if args.command == 'slowest':
+        rows = slowest_stages(records)
+    elif args.command == 'failures':
+        rows = failure_rates(records)
+    else:
+        rows = [
+            {
+                "run_id": r.get("run_id"),
+                "started_at": r.get("started_at"),
+                "outcome": r.get("outcome"),
+                "failed_stage": r.get("failed_stage") or '',
+                "duration_ms": r.get("duration_ms"),
+                "total_tokens": (r.get("tokens") or {}).get("total_tokens", ''),
+            }
+            for r in reversed(records)
+        ]
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        _print_table(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
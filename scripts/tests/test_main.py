@@ -0,0 +1,115 @@
+"""
+main.py のテスト（ZoomHandler / GPT5Generator / DiscordPoster を差し替えて実行）
+実行方法: python -m pytest scripts/tests
+"""
+
+import os
+import re
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("openai")
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+# main.py はインポート時にログ設定を行うため、テストごとに別プロセスで実行する
+DRIVER = '''
+import os
+import sys
+sys.path.insert(0, {scripts_dir!r})
+import main
+
+
+class FakeZoomHandler:
+    def get_recording_info(self, meeting_uuid):
+        return {{"topic": "テスト講義", "duration": int(os.environ["FAKE_DURATION"]), "share_url": "https://zoom.us/rec/x"}}
+
+
+class FakeGPT5Generator:
+    last_usage = {{"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}}
+
+    def generate_content(self, recording_data, meeting_topic=''):
+        return {{"title": "タイトル", "description": "説明", "tags": []}}
+
+
+class FakeDiscordPoster:
+    def post_to_forum(self, **kwargs):
+        return os.environ.get("FAKE_POST_OK", "1") == "1"
+
+
+main.ZoomHandler = FakeZoomHandler
+main.GPT5Generator = FakeGPT5Generator
+main.DiscordPoster = FakeDiscordPoster
+main.main()
+'''
+
+LOG_LINE = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} - main - (INFO|WARNING|ERROR) - ')
+
+
+def _run_main(tmp_path, **env):
+    driver = tmp_path / "driver.py"
+    driver.write_text(DRIVER.format(scripts_dir=str(SCRIPTS_DIR)), encoding='utf-8')
+
+    run_env = {k: v for k, v in os.environ.items() if not k.startswith("RUN_LEDGER_")}
+    run_env.update({
+        "PYTHONIOENCODING": "utf-8",
+        "MEETING_UUID": "uuid-1",
+        "MIN_RECORDING_DURATION": "30",
+        "FAKE_DURATION": "60",
+        "FAKE_POST_OK": "1",
+    })
+    run_env.update(env)
+    run_env = {k: v for k, v in run_env.items() if v is not None}
+    result = subprocess.run(
+        [sys.executable, str(driver)], cwd=tmp_path, env=run_env,
+        capture_output=True, text=True, encoding='utf-8', timeout=60
+    )
+
+    ledger = tmp_path / "logs" / "run_ledger.jsonl"
+    records = [json.loads(line) for line in ledger.read_text(encoding='utf-8').splitlines()]
+    [log_file] = (tmp_path / "logs").glob("zoom_discord_*.log")
+    return result, records, log_file.read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize("env, exit_code, outcome, failed_stage", [
+    ({}, 0, "success", None),
+    ({"FAKE_DURATION": "10"}, 0, "skipped", None),
+    ({"MEETING_UUID": None}, 1, "failure", "setup"),
+    ({"MIN_RECORDING_DURATION": ""}, 1, "failure", "filter"),
+    ({"FAKE_POST_OK": "0"}, 1, "failure", "discord"),
+])
+def test_main_records_outcome(tmp_path, env, exit_code, outcome, failed_stage):
+    result, records, _ = _run_main(tmp_path, **env)
+
+    assert result.returncode == exit_code, result.stderr
+    [record] = records
+    assert record["outcome"] == outcome
+    assert record["failed_stage"] == failed_stage
+    if failed_stage:
+        assert failed_stage in record["stages"]
+
+
+def test_main_records_tokens_and_stages(tmp_path):
+    _, [record], _ = _run_main(tmp_path)
+
+    assert list(record["stages"]) == ["setup", "zoom", "filter", "generate", "discord"]
+    assert record["tokens"]["total_tokens"] == 10
+    assert record["meeting_uuid"] == "uuid-1"
+
+
+def test_main_log_format_is_not_doubled(tmp_path):
+    result, _, log_text = _run_main(tmp_path, FAKE_POST_OK="0")
+
+    for output in (log_text, result.stdout):
+        lines = [line for line in output.splitlines() if LOG_LINE.match(line)]
+        assert lines
+        for line in lines:
+            assert line.count(" - main - ") == 1, line
+            assert "INFO:main:" not in line and "ERROR:main:" not in line, line
+    assert "❌ Discord投稿に失敗しました" in log_text
+    assert "📒 実行履歴を記録しました: failure" in log_text
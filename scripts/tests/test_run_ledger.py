@@ -0,0 +1,180 @@
+"""
+run_ledger のテスト
+実行方法: python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run_ledger import RunLedger, RunRecorder, failure_rates, slowest_stages, main  # noqa: E402
+
+
+def _record(n: int, **kwargs) -> dict:
+    record = {"run_id": f"run-{n}", "outcome": "success", "failed_stage": None, "stages": {}, "tokens": {}}
+    record.update(kwargs)
+    return record
+
+
+def test_append_rotates_and_reads_in_order(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl", max_bytes=200, backup_count=2)
+    for n in range(10):
+        ledger.append(_record(n))
+
+    # 1行約90バイトなので各ファイル2行、最新＋バックアップ2つ分だけ残る
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "ledger.jsonl", "ledger.jsonl.1", "ledger.jsonl.2"
+    ]
+    for path in tmp_path.iterdir():
+        assert path.stat().st_size <= 200
+
+    ids = [r["run_id"] for r in ledger.read()]
+    assert ids == [f"run-{n}" for n in range(4, 10)]
+    assert [r["run_id"] for r in ledger.read(last=3)] == ["run-7", "run-8", "run-9"]
+    assert ledger.read(last=0) == []
+
+
+def test_rotation_without_backups_truncates(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl", max_bytes=200, backup_count=0)
+    for n in range(5):
+        ledger.append(_record(n))
+
+    assert [p.name for p in tmp_path.iterdir()] == ["ledger.jsonl"]
+    assert [r["run_id"] for r in ledger.read()] == ["run-4"]
+
+
+def test_read_skips_broken_lines(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = RunLedger(path, max_bytes=0, backup_count=1)
+    ledger.append(_record(1))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"run_id": "trunc')
+    assert [r["run_id"] for r in ledger.read()] == ["run-1"]
+
+
+def test_invalid_env_falls_back_to_defaults(monkeypatch, tmp_path):
+    monkeypatch.setenv('RUN_LEDGER_MAX_BYTES', 'abc')
+    monkeypatch.setenv('RUN_LEDGER_BACKUP_COUNT', '')
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+    assert ledger.max_bytes == 1024 * 1024
+    assert ledger.backup_count == 5
+
+
+def test_recorder_success(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+    recorder = RunRecorder(ledger, "uuid-1")
+    with recorder.stage("zoom"):
+        pass
+    recorder.set_tokens({"total_tokens": 42})
+    recorder.finish()
+
+    [record] = ledger.read()
+    assert record["outcome"] == "success"
+    assert record["failed_stage"] is None
+    assert record["meeting_uuid"] == "uuid-1"
+    assert set(record["stages"]) == {"zoom"}
+    assert record["tokens"] == {"total_tokens": 42}
+    assert record["duration_ms"] >= 0
+
+
+def test_recorder_system_exit_marks_stage_failed(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+    recorder = RunRecorder(ledger)
+    with pytest.raises(SystemExit):
+        with recorder.stage("zoom"):
+            pass
+        with recorder.stage("generate"):
+            sys.exit(1)
+    recorder.finish()
+
+    [record] = ledger.read()
+    assert record["outcome"] == "failure"
+    assert record["failed_stage"] == "generate"
+    assert set(record["stages"]) == {"zoom", "generate"}
+
+
+def test_recorder_exception_and_skip(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+
+    recorder = RunRecorder(ledger)
+    try:
+        with recorder.stage("discord"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        recorder.fail()
+    recorder.finish()
+
+    recorder = RunRecorder(ledger)
+    with recorder.stage("zoom"):
+        recorder.fail()  # 実行中のステージに帰属
+    recorder.finish()
+
+    recorder = RunRecorder(ledger)
+    recorder.fail()  # ステージ外の失敗
+    recorder.finish()
+
+    recorder = RunRecorder(ledger)
+    recorder.skip()
+    recorder.finish()
+
+    outcomes = [(r["outcome"], r["failed_stage"]) for r in ledger.read()]
+    assert outcomes == [
+        ("failure", "discord"), ("failure", "zoom"), ("failure", None), ("skipped", None)
+    ]
+
+
+def test_slowest_stages():
+    records = [
+        _record(1, stages={"zoom": 100.0, "generate": 3000.0}),
+        _record(2, stages={"zoom": 300.0, "generate": 5000.0, "discord": 50.0}),
+    ]
+    rows = slowest_stages(records)
+    assert [r["stage"] for r in rows] == ["generate", "zoom", "discord"]
+    assert rows[0] == {"stage": "generate", "runs": 2, "avg_ms": 4000.0, "max_ms": 5000.0}
+    assert rows[2]["runs"] == 1
+
+
+def test_failure_rates():
+    records = [
+        _record(1, stages={"zoom": 1.0, "generate": 1.0}),
+        _record(2, stages={"zoom": 1.0, "generate": 1.0}, outcome="failure", failed_stage="generate"),
+        _record(3, stages={"zoom": 1.0}, outcome="failure", failed_stage="zoom"),
+        _record(4, stages={"zoom": 1.0, "generate": 1.0}),
+    ]
+    rows = {r["stage"]: r for r in failure_rates(records)}
+    assert rows["zoom"] == {"stage": "zoom", "runs": 4, "failures": 1, "failure_rate": 0.25}
+    assert rows["generate"] == {"stage": "generate", "runs": 3, "failures": 1, "failure_rate": 0.333}
+
+
+def test_failure_rates_unattributed_failures_stay_within_100_percent():
+    records = [
+        _record(n, stages={"zoom": 1.0}, outcome="failure", failed_stage=None)
+        for n in range(3)
+    ]
+    rows = {r["stage"]: r for r in failure_rates(records)}
+    assert rows["unknown"] == {"stage": "unknown", "runs": 3, "failures": 3, "failure_rate": 1.0}
+    assert rows["zoom"]["failures"] == 0
+    assert all(r["failure_rate"] <= 1.0 for r in rows.values())
+
+
+def test_cli_outputs_table(tmp_path, capsys):
+    path = tmp_path / "ledger.jsonl"
+    RunLedger(path).append(_record(1, stages={"zoom": 12.5}))
+
+    assert main(["slowest", "--path", str(path)]) == 0
+    out = capsys.readouterr().out
+    assert "zoom" in out and "12.5" in out
+
+    assert main(["recent", "--path", str(tmp_path / "missing.jsonl")]) == 0
+    assert "(レコードなし)" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("value", ["0", "-3", "abc"])
+def test_cli_rejects_non_positive_last(tmp_path, capsys, value):
+    with pytest.raises(SystemExit) as exc:
+        main(["failures", "--last", value, "--path", str(tmp_path / "ledger.jsonl")])
+    assert exc.value.code == 2
+    assert "--last" in capsys.readouterr().err